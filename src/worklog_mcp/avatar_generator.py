@@ -1,12 +1,53 @@
 """アバター画像生成機能"""
 
+import asyncio
 import os
 import base64
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Final, Optional
 from PIL import Image, ImageDraw
 import aiofiles
 
+# OpenAI画像生成のサイズと品質（表示は128px以下のため小さめをデフォルトとする）
+_AVATAR_SIZE = os.getenv("WORKLOG_AVATAR_SIZE", "512x512")
+_AVATAR_QUALITY = os.getenv("WORKLOG_AVATAR_QUALITY", "medium")
+
+# グラデーション画像の保存形式（webp: ロスレスWebP / png: 従来のPNG）
+_AVATAR_FORMAT = os.getenv("WORKLOG_AVATAR_FORMAT", "webp").lower()
+
+# バックグラウンドでのOpenAI画像生成の同時実行数上限
+_OPENAI_CONCURRENCY = int(os.getenv("WORKLOG_OPENAI_CONCURRENCY", "4"))
+_openai_semaphore: Optional[asyncio.Semaphore] = None
+_openai_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_openai_semaphore() -> asyncio.Semaphore:
+    """OpenAI呼び出し用セマフォを取得する
+
+    別のイベントループに紐づいたセマフォを使わないよう、実行中のループごとに遅延生成する
+    """
+    global _openai_semaphore, _openai_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _openai_semaphore is None or _openai_semaphore_loop is not loop:
+        _openai_semaphore = asyncio.Semaphore(_OPENAI_CONCURRENCY)
+        _openai_semaphore_loop = loop
+    return _openai_semaphore
+
+
+def _temp_path_for(avatar_path: Path) -> Path:
+    """アバターと同じディレクトリに一時ファイルを作成してそのパスを返す
+
+    同一ファイルシステム上に置くことで os.replace によるアトミックな置き換えを可能にする
+    """
+    fd, tmp = tempfile.mkstemp(
+        dir=avatar_path.parent, prefix=f".{avatar_path.name}.", suffix=".tmp"
+    )
+    os.close(fd)
+    # mkstempは0600で作成するため通常のファイルと同じ権限に揃える
+    os.chmod(tmp, 0o644)
+    return Path(tmp)
+
 
 async def generate_openai_avatar(
     name: str,
@@ -75,8 +116,8 @@ async def generate_openai_avatar(
                 {
                     "type": "image_generation",
                     "background": "transparent",
-                    "quality": "high",
-                    "size": "1024x1024",
+                    "quality": _AVATAR_QUALITY,
+                    "size": _AVATAR_SIZE,
                 }
             ],
         )
@@ -106,8 +147,15 @@ async def generate_openai_avatar(
         avatar_path = avatar_dir / f"{user_id}_ai.png"
         logger.debug(f"アバター保存先: {avatar_path}")
 
-        async with aiofiles.open(avatar_path, "wb") as f:
-            await f.write(base64.b64decode(image_base64))
+        # 一時ファイルに書き込んでから置き換え、配信中に書きかけのファイルが見えないようにする
+        tmp_path = _temp_path_for(avatar_path)
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(base64.b64decode(image_base64))
+            os.replace(tmp_path, avatar_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
         logger.info(f"OpenAI生成アバター保存完了: {avatar_path}")
         return str(avatar_path)
@@ -132,62 +180,101 @@ async def generate_openai_avatar(
         return None
 
 
+# カラーマッピング
+_COLOR_MAP: Final[dict[str, tuple[int, int, int]]] = {
+    "Red": (255, 100, 100),
+    "Blue": (100, 150, 255),
+    "Green": (100, 200, 100),
+    "Yellow": (255, 220, 100),
+    "Purple": (200, 100, 255),
+    "Orange": (255, 150, 100),
+    "Pink": (255, 150, 200),
+    "Cyan": (100, 200, 255),
+}
+_DEFAULT_COLOR: Final[tuple[int, int, int]] = _COLOR_MAP["Blue"]
+
+# グラデーション画像の既定サイズ
+_GRADIENT_SIZE: Final = 256
+
+
+def _build_rings(
+    base_color: tuple[int, int, int], radius: int
+) -> list[tuple[int, tuple[int, int, int, int]]]:
+    """グラデーションを構成する各リングの半径とRGBA色を計算する
+
+    外側から内側に向かって並べる（最適化：ステップを大きくして描画回数を半減）
+    """
+    rings = []
+    for i in range(radius, 0, -10):
+        # アルファ値と色の明度を調整してグラデーション効果を作成
+        alpha = int(255 * (i / radius) * 0.8)  # 外側ほど薄く
+        brightness = 0.6 + 0.4 * (i / radius)  # 外側ほど明るく
+        color = tuple(int(c * brightness) for c in base_color) + (alpha,)
+        rings.append((i, color))
+    return rings
+
+
+# テーマごとのリング色（既定サイズ分をインポート時に一度だけ計算）
+_THEME_RINGS = {
+    name: _build_rings(color, _GRADIENT_SIZE // 2 - 5)
+    for name, color in _COLOR_MAP.items()
+}
+
+
 async def generate_gradient_avatar(
-    theme_color: str, user_id: str, project_context
+    theme_color: str, user_id: str, project_context, size: int = _GRADIENT_SIZE
 ) -> str:
     """テーマカラーの単色グラデーション丸画像を生成する（フォールバック用）
 
     Args:
         theme_color: テーマカラー
         user_id: ユーザーID
+        size: 画像の一辺のピクセル数（表示側でCSSにより拡縮される）
 
     Returns:
         生成された画像ファイルのパス
     """
-    # カラーマッピング
-    color_map = {
-        "Red": (255, 100, 100),
-        "Blue": (100, 150, 255),
-        "Green": (100, 200, 100),
-        "Yellow": (255, 220, 100),
-        "Purple": (200, 100, 255),
-        "Orange": (255, 150, 100),
-        "Pink": (255, 150, 200),
-        "Cyan": (100, 200, 255),
-    }
-
-    base_color = color_map.get(theme_color, (100, 150, 255))  # デフォルトはBlue
-
-    # 512x512の透明背景画像を作成
-    size = 512
+    # size x size の透明背景画像を作成
     img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
 
     # グラデーション効果のため、中心から外側に向かって複数の円を描画
     center = size // 2
-    radius = center - 10
-
-    # 外側から内側に向かってグラデーション（最適化：ステップを大きくして描画回数を半減）
-    for i in range(radius, 0, -10):
-        # アルファ値と色の明度を調整してグラデーション効果を作成
-        alpha = int(255 * (i / radius) * 0.8)  # 外側ほど薄く
-        brightness = 0.6 + 0.4 * (i / radius)  # 外側ほど明るく
-
-        color = tuple(int(c * brightness) for c in base_color) + (alpha,)
+    radius = center - 5
 
-        left = center - i
-        top = center - i
-        right = center + i
-        bottom = center + i
+    # 既定サイズはインポート時に計算済みのリング色を使う
+    if size == _GRADIENT_SIZE:
+        rings = _THEME_RINGS.get(theme_color, _THEME_RINGS["Blue"])  # デフォルトはBlue
+    else:
+        base_color = _COLOR_MAP.get(theme_color, _DEFAULT_COLOR)
+        rings = _build_rings(base_color, radius)
 
-        draw.ellipse([left, top, right, bottom], fill=color)
+    for i, color in rings:
+        draw.ellipse([center - i, center - i, center + i, center + i], fill=color)
 
     # プロジェクト専用のアバターディレクトリパスを取得
     avatar_dir = Path(project_context.get_avatar_path())
 
-    avatar_path = avatar_dir / f"{user_id}_gradient.png"
-    # PNG保存最適化：圧縮レベルを下げて保存時間を短縮
-    img.save(avatar_path, "PNG", optimize=False, compress_level=1)
+    if _AVATAR_FORMAT == "png":
+        avatar_path = avatar_dir / f"{user_id}_gradient.png"
+        # リング数分の色しか使わないためパレット化してzlibの入力を1/4にする
+        # （FASTOCTREEはアルファ付きのまま量子化できる）
+        img = img.quantize(colors=32, method=Image.Quantize.FASTOCTREE)
+        # PNG保存最適化：圧縮レベルを下げて保存時間を短縮
+        save_args = {"format": "PNG", "optimize": False, "compress_level": 1}
+    else:
+        avatar_path = avatar_dir / f"{user_id}_gradient.webp"
+        # 色数の少ない合成画像はロスレスWebPの方が小さく高速（method=0が最速）
+        save_args = {"format": "WEBP", "lossless": True, "quality": 0, "method": 0}
+
+    # 一時ファイルに保存してからアトミックに置き換える
+    tmp_path = _temp_path_for(avatar_path)
+    try:
+        img.save(tmp_path, **save_args)
+        os.replace(tmp_path, avatar_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
     return str(avatar_path)
 
@@ -216,10 +303,11 @@ async def generate_user_avatar_async(
         project_context: プロジェクトコンテキスト
     """
     try:
-        # まずOpenAI APIでの生成を試行
-        openai_path = await generate_openai_avatar(
-            name, role, personality, appearance, user_id, project_context
-        )
+        # まずOpenAI APIでの生成を試行（一括登録時にレート制限へ達しないよう同時実行数を制限）
+        async with _get_openai_semaphore():
+            openai_path = await generate_openai_avatar(
+                name, role, personality, appearance, user_id, project_context
+            )
 
         if openai_path:
             # AI生成が成功した場合のみデータベース更新と通知を実行
@@ -289,8 +377,6 @@ async def generate_user_avatar(
     avatar_path = await generate_gradient_avatar(theme_color, user_id, project_context)
 
     # バックグラウンドでOpenAI生成を開始（結果は待たない）
-    import asyncio
-
     asyncio.create_task(
         generate_user_avatar_async(
             name, role, personality, appearance, theme_color, user_id, project_context
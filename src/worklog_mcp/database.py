@@ -3,9 +3,10 @@
 import aiosqlite
 import os
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
 
 from .models import User, WorklogEntry, AgentSession, AgentExecutionResult, ConversationMessage, SessionStatus, MessageRole
 from .logging_config import setup_logging
@@ -15,6 +16,14 @@ setup_logging()
 
 logger = logging.getLogger(__name__)
 
+# 接続ごとに適用するPRAGMA（journal_mode=WALはDBファイルに永続化されるためinitializeで設定）
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+)
+
 
 class Database:
     """SQLiteデータベース管理クラス"""
@@ -29,7 +38,9 @@ class Database:
         # 初回起動かどうかを事前に確認
         is_first = await self.is_first_run()
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
+            # WALモードは永続的なため一度設定すれば以降の接続にも有効
+            await db.execute("PRAGMA journal_mode=WAL")
             await self._create_tables(db)
             await db.commit()
 
@@ -40,6 +51,14 @@ class Database:
             )
             await self.import_example_agents(project_context)
 
+    @asynccontextmanager
+    async def _connect(self) -> AsyncIterator[aiosqlite.Connection]:
+        """PRAGMA設定済みのデータベース接続を開く"""
+        async with aiosqlite.connect(self.db_path) as db:
+            for pragma in _CONNECTION_PRAGMAS:
+                await db.execute(pragma)
+            yield db
+
     async def _create_tables(self, db: aiosqlite.Connection) -> None:
         """テーブル作成"""
         # ユーザーテーブル
@@ -153,7 +172,7 @@ class Database:
 
     async def is_first_run(self) -> bool:
         """初回起動かどうか確認"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             try:
                 cursor = await db.execute("SELECT COUNT(*) FROM users")
                 count = await cursor.fetchone()
@@ -165,7 +184,7 @@ class Database:
     # ユーザー管理
     async def create_user(self, user: User) -> None:
         """ユーザー作成"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 "INSERT INTO users (user_id, name, theme_color, role, personality, appearance, description, model, mcp, tools, instruction, avatar_path, created_at, last_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
                 (
@@ -189,7 +208,7 @@ class Database:
 
     async def get_user(self, user_id: str) -> Optional[User]:
         """ユーザー取得"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 "SELECT user_id, name, theme_color, role, personality, appearance, description, model, mcp, tools, instruction, avatar_path, created_at, last_active FROM users WHERE user_id = ?",
                 (user_id,),
@@ -220,7 +239,7 @@ class Database:
 
     async def get_all_users(self) -> List[User]:
         """全ユーザー取得"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 "SELECT user_id, name, theme_color, role, personality, appearance, description, model, mcp, tools, instruction, avatar_path, created_at, last_active FROM users ORDER BY last_active DESC"
             )
@@ -251,7 +270,7 @@ class Database:
 
     async def update_user_last_active(self, user_id: str) -> None:
         """ユーザーの最終活動時刻を更新"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 "UPDATE users SET last_active = ? WHERE user_id = ?",
                 (datetime.now(), user_id),
@@ -260,7 +279,7 @@ class Database:
 
     async def update_user_avatar_path(self, user_id: str, avatar_path: str) -> bool:
         """ユーザーのアバターパスを更新する"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 "UPDATE users SET avatar_path = ? WHERE user_id = ?",
                 (avatar_path, user_id),
@@ -290,14 +309,14 @@ class Database:
         values.append(user_id)
         sql = f"UPDATE users SET {', '.join(set_clauses)} WHERE user_id = ?"
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(sql, values)
             await db.commit()
             return db.total_changes > 0
 
     async def delete_user(self, user_id: str) -> bool:
         """ユーザーを削除する（関連する分報エントリーも削除）"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             # まず関連する分報エントリーを削除
             await db.execute("DELETE FROM entries WHERE user_id = ?", (user_id,))
 
@@ -310,7 +329,7 @@ class Database:
     # エントリー管理
     async def create_entry(self, entry: WorklogEntry) -> None:
         """エントリー作成"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 "INSERT INTO entries (id, user_id, markdown_content, created_at) VALUES (?, ?, ?, ?)",
                 (
@@ -327,7 +346,7 @@ class Database:
 
     async def get_entry(self, entry_id: str) -> Optional[WorklogEntry]:
         """エントリー取得"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 "SELECT id, user_id, markdown_content, created_at FROM entries WHERE id = ?",
                 (entry_id,),
@@ -346,7 +365,7 @@ class Database:
 
     async def update_entry(self, entry_id: str, markdown_content: str) -> bool:
         """エントリー更新"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 "UPDATE entries SET markdown_content = ? WHERE id = ?",
                 (markdown_content, entry_id),
@@ -356,7 +375,7 @@ class Database:
 
     async def delete_entry(self, entry_id: str) -> bool:
         """エントリー削除"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 "DELETE FROM entries WHERE id = ?",
                 (entry_id,),
@@ -366,7 +385,7 @@ class Database:
 
     async def truncate_entries(self, user_id: Optional[str] = None) -> int:
         """エントリー全削除（オプションで特定ユーザーのみ）"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             if user_id:
                 cursor = await db.execute(
                     "DELETE FROM entries WHERE user_id = ?",
@@ -381,7 +400,7 @@ class Database:
         self, include_users: bool = False, avatar_dir: Optional[str] = None
     ) -> dict:
         """全データ削除（オプションでユーザーテーブルも含む）"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             entries_count = 0
             users_count = 0
             avatars_deleted = 0
@@ -494,7 +513,7 @@ class Database:
             query += " LIMIT ?"
             params.append(count)
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(query, params)
             rows = await cursor.fetchall()
             return [
@@ -534,7 +553,7 @@ class Database:
 
         query += " ORDER BY created_at DESC"
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(query, params)
             rows = await cursor.fetchall()
             return [
@@ -553,7 +572,7 @@ class Database:
 
     async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
         """ユーザー統計情報取得"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             # 総投稿数
             cursor = await db.execute(
                 "SELECT COUNT(*) FROM entries WHERE user_id = ?", (user_id,)
@@ -632,7 +651,7 @@ class Database:
             skipped_count = 0
             avatar_copied_count = 0
 
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._connect() as db:
                 for json_file in json_files:
                     try:
                         # JSONファイルを読み込み
@@ -804,7 +823,7 @@ class Database:
             updated_count = 0
             avatar_copied_count = 0
 
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._connect() as db:
                 # avatar_pathが空またはNullのユーザーを取得
                 cursor = await db.execute(
                     "SELECT user_id, name FROM users WHERE avatar_path IS NULL OR avatar_path = ''"
@@ -869,7 +888,7 @@ class Database:
     # エージェントセッション管理
     async def create_agent_session(self, session: AgentSession) -> None:
         """エージェントセッション作成"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 """INSERT INTO agent_sessions 
                 (session_id, agent_id, user_id, claude_process_id, workspace_path, 
@@ -891,7 +910,7 @@ class Database:
 
     async def get_agent_session(self, session_id: str) -> Optional[AgentSession]:
         """エージェントセッション取得"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """SELECT session_id, agent_id, user_id, claude_process_id, workspace_path, 
                           mcp_config_path, status, created_at, last_activity 
@@ -915,7 +934,7 @@ class Database:
 
     async def update_agent_session_status(self, session_id: str, status: SessionStatus) -> None:
         """エージェントセッション状態更新"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 "UPDATE agent_sessions SET status = ?, last_activity = ? WHERE session_id = ?",
                 (status.value, datetime.now(), session_id),
@@ -924,7 +943,7 @@ class Database:
 
     async def update_agent_session_process_id(self, session_id: str, process_id: str) -> None:
         """エージェントセッションのプロセスID更新"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 "UPDATE agent_sessions SET claude_process_id = ?, last_activity = ? WHERE session_id = ?",
                 (process_id, datetime.now(), session_id),
@@ -948,7 +967,7 @@ class Database:
 
         query += " ORDER BY created_at DESC"
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(query, params)
             rows = await cursor.fetchall()
             return [
@@ -968,7 +987,7 @@ class Database:
 
     async def delete_agent_session(self, session_id: str) -> None:
         """エージェントセッション削除"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             # 関連する実行結果と会話履歴も削除
             await db.execute("DELETE FROM conversation_messages WHERE session_id = ?", (session_id,))
             await db.execute("DELETE FROM agent_execution_results WHERE session_id = ?", (session_id,))
@@ -979,7 +998,7 @@ class Database:
     async def save_execution_result(self, result: AgentExecutionResult) -> None:
         """エージェント実行結果保存"""
         import uuid
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 """INSERT INTO agent_execution_results 
                 (id, session_id, command, output, error, execution_time, timestamp) 
@@ -998,7 +1017,7 @@ class Database:
 
     async def get_execution_history(self, session_id: str, limit: int = 50) -> List[AgentExecutionResult]:
         """エージェント実行履歴取得"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """SELECT id, session_id, command, output, error, execution_time, timestamp 
                    FROM agent_execution_results 
@@ -1024,7 +1043,7 @@ class Database:
     async def save_conversation_message(self, message: ConversationMessage) -> None:
         """会話メッセージ保存"""
         import json
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 """INSERT INTO conversation_messages 
                 (message_id, session_id, role, content, timestamp, metadata_json) 
@@ -1043,7 +1062,7 @@ class Database:
     async def get_conversation_history(self, session_id: str, limit: int = 100) -> List[ConversationMessage]:
         """会話履歴取得"""
         import json
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """SELECT message_id, session_id, role, content, timestamp, metadata_json 
                    FROM conversation_messages 
@@ -1067,6 +1086,6 @@ class Database:
 
     async def clear_conversation_history(self, session_id: str) -> None:
         """会話履歴クリア"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute("DELETE FROM conversation_messages WHERE session_id = ?", (session_id,))
             await db.commit()
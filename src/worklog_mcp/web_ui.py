@@ -3,6 +3,7 @@
 import asyncio
 import json
 import logging
+import mimetypes
 import os
 from datetime import datetime
 from typing import Any, Dict, List, Optional
@@ -17,6 +18,9 @@ from .models import WorklogEntry
 
 logger = logging.getLogger(__name__)
 
+# WebPアバター配信用（Python 3.10のmimetypesには未登録の場合がある）
+mimetypes.add_type("image/webp", ".webp")
+
 
 class WebDatabaseAdapter:
     """Web API用のデータベースアダプター"""